@@ -0,0 +1,253 @@
+"""
+UnAI - Admission control
+Estimates the decode cost of an upload and limits how many files of each
+media type are analysed at once, so bursts of large files queue or get
+rejected instead of exhausting worker memory.
+"""
+
+import os
+import json
+import time
+import uuid
+import asyncio
+import tempfile
+import threading
+from contextlib import contextmanager, asynccontextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: budgets are then per process
+    fcntl = None
+
+from probe import scaled_size
+
+MB = 1024 * 1024
+
+# Shared by every worker process in the container
+STATE_FILE = os.environ.get(
+    'ADMISSION_STATE_FILE', os.path.join(tempfile.gettempdir(), 'unai-admission.json')
+)
+
+# Rough peak working-set multipliers for the detectors in app.py
+IMAGE_BYTES_PER_PIXEL = 80     # RGB + gray + complex FFT + LBP codes
+TILED_BYTES_PER_PIXEL = 32     # RGB + gray + pyramid; tile buffers are small
+VIDEO_BASE_BYTES = 64 * MB     # ffmpeg reader process and moviepy buffers
+VIDEO_BYTES_PER_PIXEL = 110    # one decoded frame plus its image analysis
+AUDIO_DECODE_BYTES = 4         # float32 per channel sample at the native rate
+AUDIO_BYTES_PER_SAMPLE = 48    # mono PCM plus STFT/MFCC feature matrices
+COMPRESSED_EXPANSION = 10      # fallback when headers lack dimensions
+
+class AdmissionRejected(Exception):
+    """Raised when an upload can't be admitted for analysis"""
+    def __init__(self, message, status_code=503, retry_after=None):
+        super(AdmissionRejected, self).__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+def estimate_cost(probe):
+    """Estimate peak memory in bytes needed to analyse a probed file
+
+    probe is the result of probe.probe_file, so the estimate reflects the
+    downscaling and excerpting its plan will apply.
+    """
+    file_type = probe['file_type']
+    plan = probe.get('plan', {})
+
+    if file_type == 'image' and probe.get('width'):
+        width, height = probe['width'], probe['height']
+        if 'max_side' in plan:
+            width, height = scaled_size(width, height, plan['max_side'])
+        if plan.get('tiled'):
+            return width * height * TILED_BYTES_PER_PIXEL
+        return width * height * IMAGE_BYTES_PER_PIXEL
+
+    if file_type == 'video' and probe.get('width'):
+        width, height = probe['width'], probe['height']
+        if 'frame_height' in plan:
+            width = width * plan['frame_height'] // height
+            height = plan['frame_height']
+        return VIDEO_BASE_BYTES + width * height * VIDEO_BYTES_PER_PIXEL
+
+    if file_type == 'audio' and probe.get('sample_rate'):
+        duration = min(probe['duration'], plan.get('max_duration', probe['duration']))
+        # librosa.load decodes every channel at the native rate before it
+        # mixes to mono and resamples, so that part ignores the plan's rate
+        native_frames = int(duration * probe['sample_rate'])
+        decode = native_frames * (probe['channels'] + 1) * AUDIO_DECODE_BYTES
+        frames = int(duration * plan.get('sample_rate', probe['sample_rate']))
+        return decode + frames * AUDIO_BYTES_PER_SAMPLE
+
+    return probe['size_bytes'] * COMPRESSED_EXPANSION
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def _start_time(pid):
+    """Process start time in clock ticks since boot, or None where unknown"""
+    try:
+        with open(f'/proc/{pid}/stat') as stat:
+            # The command name may contain spaces; fields after it are fixed
+            return int(stat.read().rsplit(')', 1)[1].split()[19])
+    except (OSError, ValueError, IndexError):
+        return None
+
+def _owner():
+    return {'pid': os.getpid(), 'started': _start_time(os.getpid())}
+
+def _owner_alive(entry):
+    """Whether the process that made entry still runs
+
+    Comparing start times stops a restarted container, whose new process
+    often gets the same small pid, from inheriting dead reservations.
+    """
+    if not _pid_alive(entry['pid']):
+        return False
+    started = entry.get('started')
+    return started is None or _start_time(entry['pid']) in (None, started)
+
+def clear_state(state_file=STATE_FILE):
+    """Forget all reservations; call once before workers start"""
+    try:
+        os.remove(state_file)
+    except FileNotFoundError:
+        pass
+
+class AdmissionController:
+    """Per-media-type concurrency and memory budgets shared by all workers
+
+    limits maps a file type to a dict with:
+      concurrency - analyses of that type allowed to run at once
+      memory_mb   - total estimated memory they may hold
+      queue       - uploads allowed to wait for a slot
+
+    Reservations live in a small JSON file guarded by an exclusive file
+    lock, so every gunicorn worker and pool process draws on the same
+    container-wide budget. Entries left by dead processes are dropped.
+    The file outlives the server, so clear_state() it at startup.
+    """
+    def __init__(self, limits, state_file=STATE_FILE, queue_timeout=30,
+                 retry_after=5, poll_interval=0.05):
+        self.limits = limits
+        self.state_file = state_file
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _state(self):
+        """Locked read-modify-write access to the shared reservation state"""
+        with self._lock:
+            fd = os.open(self.state_file, os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                if fcntl:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                with os.fdopen(os.dup(fd), 'r+') as state_io:
+                    raw = state_io.read()
+                    state = json.loads(raw) if raw else {}
+                    state.setdefault('reserved', {})
+                    state.setdefault('waiting', {})
+                    for entries in (state['reserved'], state['waiting']):
+                        for token in [t for t, e in entries.items() if not _owner_alive(e)]:
+                            del entries[token]
+                    yield state
+                    state_io.seek(0)
+                    state_io.truncate()
+                    json.dump(state, state_io)
+            finally:
+                os.close(fd)
+
+    def _check_budget(self, file_type, cost):
+        limit = self.limits[file_type]
+        if cost > limit['memory_mb'] * MB:
+            raise AdmissionRejected(
+                f"File needs about {cost // MB} MB to analyse, "
+                f"over the {limit['memory_mb']} MB {file_type} limit",
+                status_code=413
+            )
+
+    def _try_reserve(self, token, file_type, cost, deadline):
+        """Reserve if the budget allows, otherwise join the queue
+
+        Returns False while the caller should keep waiting and raises
+        AdmissionRejected when the queue is full or the deadline passes.
+        """
+        limit = self.limits[file_type]
+        with self._state() as state:
+            active = [e for e in state['reserved'].values() if e['type'] == file_type]
+            if (len(active) < limit['concurrency'] and
+                    sum(e['cost'] for e in active) + cost <= limit['memory_mb'] * MB):
+                state['waiting'].pop(token, None)
+                state['reserved'][token] = dict(_owner(), type=file_type, cost=cost)
+                return True
+
+            if token not in state['waiting']:
+                waiting = sum(1 for e in state['waiting'].values() if e['type'] == file_type)
+                if time.monotonic() >= deadline or waiting >= limit.get('queue', 0):
+                    raise AdmissionRejected(
+                        f"Too many {file_type} files are being analysed, please retry shortly",
+                        retry_after=self.retry_after
+                    )
+                state['waiting'][token] = dict(_owner(), type=file_type)
+            elif time.monotonic() >= deadline:
+                raise AdmissionRejected(
+                    f"Timed out waiting to analyse {file_type} file, please retry shortly",
+                    retry_after=self.retry_after
+                )
+            return False
+
+    def _forget(self, token):
+        with self._state() as state:
+            state['reserved'].pop(token, None)
+            state['waiting'].pop(token, None)
+
+    def _begin(self, file_type, cost, timeout):
+        self._check_budget(file_type, cost)
+        timeout = self.queue_timeout if timeout is None else timeout
+        return f"{os.getpid()}-{uuid.uuid4().hex}", time.monotonic() + timeout
+
+    @contextmanager
+    def admit(self, file_type, cost, timeout=None):
+        """Hold a slot and cost bytes of the type's budget while analysing
+
+        Waits up to timeout seconds (queue_timeout by default) for room,
+        then raises AdmissionRejected.
+        """
+        token, deadline = self._begin(file_type, cost, timeout)
+        try:
+            while not self._try_reserve(token, file_type, cost, deadline):
+                time.sleep(self.poll_interval)
+            yield
+        finally:
+            self._forget(token)
+
+    @asynccontextmanager
+    async def admit_async(self, file_type, cost, timeout=None):
+        """admit() for event loops: waits with asyncio.sleep, not time.sleep"""
+        token, deadline = self._begin(file_type, cost, timeout)
+        try:
+            while not self._try_reserve(token, file_type, cost, deadline):
+                await asyncio.sleep(self.poll_interval)
+            yield
+        finally:
+            self._forget(token)
+
+    def snapshot(self):
+        """Current usage per type across all workers, for health reporting"""
+        with self._state() as state:
+            return {
+                file_type: {
+                    'active': sum(1 for e in state['reserved'].values() if e['type'] == file_type),
+                    'waiting': sum(1 for e in state['waiting'].values() if e['type'] == file_type),
+                    'reserved_mb': round(sum(
+                        e['cost'] for e in state['reserved'].values() if e['type'] == file_type
+                    ) / MB, 1)
+                }
+                for file_type in self.limits
+            }
@@ -16,6 +16,11 @@ from moviepy.editor import VideoFileClip
 import tempfile
 import logging
 from werkzeug.utils import secure_filename
+from admission import AdmissionController, AdmissionRejected, estimate_cost
+from probe import ProbeRejected, probe_file
+import tiling
+from spill import ScratchSpace
+from readiness import Readiness
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -33,6 +38,21 @@ ALLOWED_EXTENSIONS = {
     'audio': {'mp3', 'wav', 'flac', 'ogg', 'm4a'}
 }
 
+# Audio framing shared by every spectral feature
+AUDIO_N_FFT = 2048
+AUDIO_HOP_LENGTH = 512
+AUDIO_BLOCK_FRAMES = 1024 * 1024
+
+# Per-type analysis limits; video decodes are the most memory hungry
+ADMISSION_LIMITS = {
+    'image': {'concurrency': 4, 'memory_mb': 1024, 'queue': 16},
+    'video': {'concurrency': 1, 'memory_mb': 1536, 'queue': 4},
+    'audio': {'concurrency': 2, 'memory_mb': 1024, 'queue': 8}
+}
+ADMISSION_QUEUE_TIMEOUT = int(os.environ.get('ADMISSION_QUEUE_TIMEOUT', 30))
+
+admission_controller = AdmissionController(ADMISSION_LIMITS, queue_timeout=ADMISSION_QUEUE_TIMEOUT)
+
 # Ensure upload directory exists
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
@@ -95,96 +115,111 @@ def get_file_type(filepath):
         logger.error(f"Error determining file type: {e}")
         return 'unknown'
 
-def detect_ai_image(image_path):
-    """Detect if an image is AI-generated using multiple techniques"""
-    try:
-        # Load and preprocess image
-        image = Image.open(image_path).convert('RGB')
-        
-        # Method 1: Statistical analysis
-        img_array = np.array(image)
-        
-        # Check for unusual patterns that might indicate AI generation
-        # 1. Pixel distribution analysis
-        pixel_variance = np.var(img_array)
-        pixel_mean = np.mean(img_array)
-        
+def analyze_image_array(img_array, tiled=False):
+    """Score an RGB uint8 array; the core of detect_ai_image"""
+    # Check for unusual patterns that might indicate AI generation
+    # 1. Pixel distribution analysis
+    pixel_variance = np.var(img_array)
+    pixel_mean = np.mean(img_array)
+    
+    gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
+    
+    if tiled:
+        # 2-4. Edge, frequency and texture features per tile
+        tile_stats = tiling.analyze_tiles(gray)
+        edge_density = tile_stats['edge_density']
+        freq_variance = tile_stats['frequency_variance']
+        lbp_variance = tile_stats['texture_variance']
+    else:
         # 2. Edge detection analysis
-        gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
         edges = cv2.Canny(gray, 50, 150)
         edge_density = np.sum(edges > 0) / edges.size
-        
+    
         # 3. Frequency domain analysis
         f_transform = np.fft.fft2(gray)
         f_shift = np.fft.fftshift(f_transform)
         magnitude_spectrum = np.log(np.abs(f_shift) + 1)
         freq_variance = np.var(magnitude_spectrum)
-        
-        # 4. Texture analysis using Local Binary Patterns
-        def calculate_lbp_variance(image):
-            lbp_values = []
-            for i in range(1, image.shape[0]-1):
-                for j in range(1, image.shape[1]-1):
-                    center = image[i, j]
-                    binary_string = ''
-                    for di in [-1, -1, -1, 0, 0, 1, 1, 1]:
-                        for dj in [-1, 0, 1, -1, 1, -1, 0, 1]:
-                            if len(binary_string) < 8:
-                                neighbor = image[i + di, j + dj]
-                                binary_string += '1' if neighbor >= center else '0'
-                    lbp_values.append(int(binary_string, 2))
-            return np.var(lbp_values) if lbp_values else 0
-        
-        lbp_variance = calculate_lbp_variance(gray)
-        
-        # Simple scoring system based on statistical features
-        ai_score = 0
-        
-        # AI-generated images often have:
-        # - More uniform pixel distribution
-        if pixel_variance < 1000:
-            ai_score += 0.2
-        
-        # - Smoother edges
-        if edge_density < 0.1:
-            ai_score += 0.2
-        
-        # - Different frequency characteristics
-        if freq_variance > 15:
+    
+        # 4. Texture analysis using Local Binary Patterns, the same
+        # 8-neighbour codes the tiled path uses
+        lbp_variance = tiling.lbp_variance(gray)
+    
+    # Simple scoring system based on statistical features
+    ai_score = 0
+    
+    # AI-generated images often have:
+    # - More uniform pixel distribution
+    if pixel_variance < 1000:
+        ai_score += 0.2
+    
+    # - Smoother edges
+    if edge_density < 0.1:
+        ai_score += 0.2
+    
+    # - Different frequency characteristics
+    if freq_variance > 15:
+        ai_score += 0.2
+    
+    # - More uniform textures
+    if lbp_variance < 500:
+        ai_score += 0.2
+    
+    # Additional heuristics for common AI artifacts
+    # Check for perfect symmetries or repeated patterns
+    height, width = gray.shape
+    if tiled:
+        # Check for unusual uniformity across tiles
+        if tile_stats['tile_variance_spread'] < 100:
             ai_score += 0.2
-        
-        # - More uniform textures
-        if lbp_variance < 500:
+    elif height > 100 and width > 100:
+        # Check for unusual uniformity in quarters
+        quarters = [
+            gray[:height//2, :width//2],
+            gray[:height//2, width//2:],
+            gray[height//2:, :width//2],
+            gray[height//2:, width//2:]
+        ]
+        quarter_vars = [np.var(q) for q in quarters]
+        if max(quarter_vars) - min(quarter_vars) < 100:
             ai_score += 0.2
+    
+    confidence = min(ai_score * 100, 95)  # Cap at 95%
+    is_ai = ai_score > 0.5
+    
+    features = {
+        'pixel_variance': float(pixel_variance),
+        'edge_density': float(edge_density),
+        'frequency_variance': float(freq_variance),
+        'texture_variance': float(lbp_variance)
+    }
+    if tiled:
+        features['tiles_per_level'] = tile_stats['tiles_per_level']
+    
+    return {
+        'is_ai_generated': is_ai,
+        'confidence': confidence,
+        'features': features
+    }
+
+def detect_ai_image(image_path, max_side=None, tiled=False):
+    """Detect if an image is AI-generated using multiple techniques
+
+    With tiled=True the edge, frequency and texture features are computed
+    per tile across a small image pyramid (see tiling.py) instead of once
+    over the whole image.
+    """
+    try:
+        # Load and preprocess image
+        image = Image.open(image_path)
+        if max_side and max(image.size) > max_side:
+            # JPEG can decode straight to a reduced scale
+            image.draft('RGB', (max_side, max_side))
+            image.thumbnail((max_side, max_side))
+        image = image.convert('RGB')
         
-        # Additional heuristics for common AI artifacts
-        # Check for perfect symmetries or repeated patterns
-        height, width = gray.shape
-        if height > 100 and width > 100:
-            # Check for unusual uniformity in quarters
-            quarters = [
-                gray[:height//2, :width//2],
-                gray[:height//2, width//2:],
-                gray[height//2:, :width//2],
-                gray[height//2:, width//2:]
-            ]
-            quarter_vars = [np.var(q) for q in quarters]
-            if max(quarter_vars) - min(quarter_vars) < 100:
-                ai_score += 0.2
-        
-        confidence = min(ai_score * 100, 95)  # Cap at 95%
-        is_ai = ai_score > 0.5
-        
-        return {
-            'is_ai_generated': is_ai,
-            'confidence': confidence,
-            'features': {
-                'pixel_variance': float(pixel_variance),
-                'edge_density': float(edge_density),
-                'frequency_variance': float(freq_variance),
-                'texture_variance': float(lbp_variance)
-            }
-        }
+        # Method 1: Statistical analysis
+        return analyze_image_array(np.array(image), tiled=tiled)
         
     except Exception as e:
         logger.error(f"Error analyzing image: {e}")
@@ -194,27 +229,24 @@ def detect_ai_image(image_path):
             'error': str(e)
         }
 
-def detect_ai_video(video_path):
+def detect_ai_video(video_path, max_frames=10, sample_window=30, frame_height=None):
     """Detect if a video is AI-generated"""
     try:
-        clip = VideoFileClip(video_path)
+        # ffmpeg scales frames down while decoding when frame_height is set
+        target_resolution = (frame_height, None) if frame_height else None
+        clip = VideoFileClip(video_path, audio=False, target_resolution=target_resolution)
         duration = clip.duration
         fps = clip.fps
         
         # Extract frames for analysis
-        frame_times = np.linspace(0, min(duration, 30), min(10, int(duration)))  # Max 10 frames
+        frame_times = np.linspace(0, min(duration, sample_window), max_frames)
         frames_analysis = []
         
+        # Analyze each frame as it is decoded, without re-encoding it, so
+        # only one frame is held at a time
         for t in frame_times:
-            frame = clip.get_frame(t)
-            
-            # Convert frame to PIL Image and analyze
-            frame_image = Image.fromarray(frame)
-            with tempfile.NamedTemporaryFile(suffix='.jpg', delete=False) as temp_file:
-                frame_image.save(temp_file.name)
-                frame_result = detect_ai_image(temp_file.name)
-                frames_analysis.append(frame_result['confidence'])
-                os.unlink(temp_file.name)
+            frame_result = analyze_image_array(clip.get_frame(t))
+            frames_analysis.append(frame_result['confidence'])
         
         clip.close()
         
@@ -246,23 +278,61 @@ def detect_ai_video(video_path):
             'error': str(e)
         }
 
-def detect_ai_audio(audio_path):
+def load_audio(audio_path, scratch, sample_rate=None, max_duration=None):
+    """Decode audio to mono float32, into scratch space when possible"""
+    if sample_rate is None:
+        try:
+            with sf.SoundFile(audio_path) as audio_file:
+                sr = audio_file.samplerate
+                frames = audio_file.frames
+                if max_duration:
+                    frames = min(frames, int(max_duration * sr))
+                # Read in blocks so only one block is ever held twice
+                y = scratch.empty((frames,), np.float32)
+                offset = 0
+                for block in audio_file.blocks(blocksize=AUDIO_BLOCK_FRAMES, frames=frames,
+                                               dtype='float32', always_2d=True):
+                    y[offset:offset + len(block)] = block.mean(axis=1)
+                    offset += len(block)
+                return y[:offset], sr
+        except RuntimeError:
+            # libsndfile can't decode this format; fall through to librosa
+            pass
+    return librosa.load(audio_path, sr=sample_rate, duration=max_duration)
+
+def detect_ai_audio(audio_path, sample_rate=None, max_duration=None):
     """Detect if audio is AI-generated"""
     try:
-        # Load audio file
-        y, sr = librosa.load(audio_path, sr=None)
-        
-        # Extract features
-        # 1. Spectral features
-        spectral_centroids = librosa.feature.spectral_centroid(y=y, sr=sr)
-        spectral_rolloff = librosa.feature.spectral_rolloff(y=y, sr=sr)
-        zero_crossing_rate = librosa.feature.zero_crossing_rate(y)
-        
-        # 2. MFCCs (Mel-frequency cepstral coefficients)
-        mfccs = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=13)
-        
-        # 3. Tempo and rhythm
-        tempo, beats = librosa.beat.beat_track(y=y, sr=sr)
+        with ScratchSpace() as scratch:
+            # Load audio file, resampled and excerpted as the probe planned
+            y, sr = load_audio(audio_path, scratch, sample_rate, max_duration)
+            
+            # Extract features
+            # One shared STFT replaces the separate ones each feature would compute
+            n_frames = 1 + len(y) // AUDIO_HOP_LENGTH
+            stft = scratch.empty((1 + AUDIO_N_FFT // 2, n_frames), np.complex64)
+            librosa.stft(y, n_fft=AUDIO_N_FFT, hop_length=AUDIO_HOP_LENGTH, out=stft)
+            S = scratch.empty(stft.shape, np.float32)
+            np.abs(stft, out=S)
+            del stft
+            
+            # 1. Spectral features
+            spectral_centroids = librosa.feature.spectral_centroid(S=S, sr=sr)
+            spectral_rolloff = librosa.feature.spectral_rolloff(S=S, sr=sr)
+            zero_crossing_rate = librosa.feature.zero_crossing_rate(y)
+            
+            # 2. MFCCs (Mel-frequency cepstral coefficients)
+            np.square(S, out=S)  # magnitude -> power, in place
+            mel_db = librosa.power_to_db(librosa.feature.melspectrogram(S=S, sr=sr))
+            mfccs = librosa.feature.mfcc(S=mel_db, n_mfcc=13)
+            
+            # 3. Tempo and rhythm
+            # beat_track(y=...) aggregates its onset envelope with the median
+            onset_envelope = librosa.onset.onset_strength(S=mel_db, sr=sr, aggregate=np.median)
+            tempo, beats = librosa.beat.beat_track(onset_envelope=onset_envelope, sr=sr)
+            
+            duration = len(y) / sr
+            del y, S
         
         # Analyze features for AI characteristics
         ai_score = 0
@@ -299,7 +369,7 @@ def detect_ai_audio(audio_path):
                 'spectral_variance': float(spectral_variance),
                 'mfcc_variance': float(mfcc_variance),
                 'tempo': float(tempo),
-                'duration': len(y) / sr
+                'duration': duration
             }
         }
         
@@ -311,6 +381,97 @@ def detect_ai_audio(audio_path):
             'error': str(e)
         }
 
+def analyze_path(filepath, file_type, plan=None):
+    """Run the detector matching file_type on a saved upload
+
+    plan holds detector keyword arguments chosen by probe.probe_file.
+    """
+    plan = plan or {}
+    if file_type == 'image':
+        return detect_ai_image(filepath, **plan)
+    elif file_type == 'video':
+        return detect_ai_video(filepath, **plan)
+    elif file_type == 'audio':
+        return detect_ai_audio(filepath, **plan)
+    else:
+        return {'error': 'Unsupported file type'}
+
+def admission_error(error):
+    """Turn an AdmissionRejected into a JSON error response
+
+    Returns a (body, status, headers) tuple so Flask and Quart routes can
+    both return it as is.
+    """
+    headers = {'Retry-After': str(error.retry_after)} if error.retry_after else {}
+    return {'error': str(error)}, error.status_code, headers
+
+# Warm-up steps run at worker boot, before the worker takes traffic
+# Set per worker by readiness.share_cores; defaults to every core for a lone process
+WORKER_THREADS = int(os.environ.get('WORKER_THREADS', os.cpu_count() or 1))
+
+def ensure_no_error(result):
+    if 'error' in result:
+        raise RuntimeError(result['error'])
+
+def warm_threads():
+    """Size torch and OpenCV thread pools to this worker's share of cores"""
+    torch.set_num_threads(WORKER_THREADS)
+    cv2.setNumThreads(WORKER_THREADS)
+
+def warm_image_model():
+    dummy = Image.new('RGB', (224, 224))
+    image_detector.eval()
+    with torch.no_grad():
+        image_detector(image_transform(dummy).unsqueeze(0).to(device))
+
+def warm_image():
+    buffer = io.BytesIO()
+    Image.fromarray(np.random.randint(0, 255, (64, 64, 3), dtype=np.uint8)).save(buffer, format='PNG')
+    buffer.seek(0)
+    ensure_no_error(detect_ai_image(buffer))
+    # Starts the tile thread pool
+    analyze_image_array(np.random.randint(0, 255, (600, 600, 3), dtype=np.uint8), tiled=True)
+
+def warm_video():
+    # Decode a tiny generated clip so VideoFileClip and the ffmpeg reader are hot
+    from moviepy.config import get_setting
+    import subprocess
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        clip_path = os.path.join(scratch_dir, 'warm.mp4')
+        subprocess.run(
+            [get_setting('FFMPEG_BINARY'), '-v', 'error', '-f', 'lavfi',
+             '-i', 'testsrc=duration=1:size=128x72:rate=10', '-pix_fmt', 'yuv420p', clip_path],
+            capture_output=True, check=True
+        )
+        ensure_no_error(detect_ai_video(clip_path, max_frames=1, sample_window=1))
+
+def warm_audio():
+    # Two seconds of clicks over a tone; beat tracking triggers numba JIT compilation
+    sr = 22050
+    t = np.arange(2 * sr) / sr
+    y = 0.3 * np.sin(2 * np.pi * 440 * t)
+    y[::sr // 4] = 1.0
+    buffer = io.BytesIO()
+    sf.write(buffer, y.astype(np.float32), sr, format='WAV')
+    buffer.seek(0)
+    ensure_no_error(detect_ai_audio(buffer))
+
+readiness = Readiness()
+readiness.register('threads', warm_threads)
+readiness.register('image_model', warm_image_model)
+readiness.register('image', warm_image)
+readiness.register('video', warm_video)
+readiness.register('audio', warm_audio)
+
+def warm_up_worker(report_queue=None):
+    """Process pool initializer: warm this process, then report its status
+
+    Puts (pid, per-step status) on report_queue exactly once per process.
+    """
+    readiness.warm_up()
+    if report_queue is not None:
+        report_queue.put((os.getpid(), readiness.snapshot()))
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -337,15 +498,20 @@ def analyze_file():
             os.unlink(filepath)
             return jsonify({'error': 'Unsupported file type'}), 400
         
-        # Analyze based on file type
-        if file_type == 'image':
-            result = detect_ai_image(filepath)
-        elif file_type == 'video':
-            result = detect_ai_video(filepath)
-        elif file_type == 'audio':
-            result = detect_ai_audio(filepath)
-        else:
-            result = {'error': 'Unsupported file type'}
+        # Read headers to reject bad inputs and plan the analysis
+        try:
+            probe = probe_file(filepath, file_type)
+        except ProbeRejected as e:
+            os.unlink(filepath)
+            return jsonify({'error': str(e)}), e.status_code
+        
+        # Analyze based on file type, once there is room for it
+        try:
+            with admission_controller.admit(file_type, estimate_cost(probe)):
+                result = analyze_path(filepath, file_type, probe['plan'])
+        except AdmissionRejected as e:
+            os.unlink(filepath)
+            return admission_error(e)
         
         # Clean up uploaded file
         os.unlink(filepath)
@@ -353,6 +519,10 @@ def analyze_file():
         # Add metadata
         result['file_type'] = file_type
         result['filename'] = filename
+        result['strategy'] = probe['strategy']
+        if file_type == 'audio' and 'features' in result:
+            # The detector only sees the excerpt; report the whole file's length
+            result['features']['duration'] = probe['duration']
         
         return jsonify(result)
         
@@ -362,7 +532,28 @@ def analyze_file():
 
 @app.route('/api/health')
 def health_check():
-    return jsonify({'status': 'healthy', 'message': 'UnAI Detection API is running'})
+    return jsonify({
+        'status': 'healthy',
+        'message': 'UnAI Detection API is running',
+        'ready': readiness.is_ready(),
+        'admission': admission_controller.snapshot()
+    })
+
+@app.route('/api/live')
+def liveness_check():
+    return jsonify({'status': 'alive'})
+
+@app.route('/api/ready')
+def readiness_check():
+    ready = readiness.is_ready()
+    return jsonify({
+        'status': 'ready' if ready else 'not_ready',
+        'detectors': readiness.snapshot()
+    }), 200 if ready else 503
 
 if __name__ == '__main__':
+    # The debug reloader's parent process only watches files; warm up the
+    # child that serves requests
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        readiness.start()
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
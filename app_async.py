@@ -0,0 +1,235 @@
+import os
+import uuid
+import queue
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from quart import Quart, request, jsonify, render_template
+from quart_cors import cors
+from werkzeug.utils import secure_filename
+
+from readiness import share_cores
+
+# Executor configuration
+ANALYSIS_WORKERS = int(os.environ.get('ANALYSIS_WORKERS', os.cpu_count() or 1))
+ANALYSIS_QUEUE_DEPTH = int(os.environ.get('ANALYSIS_QUEUE_DEPTH', ANALYSIS_WORKERS * 2))
+RETRY_AFTER_SECONDS = int(os.environ.get('RETRY_AFTER_SECONDS', 5))
+
+# Split cores between pool processes before anything imports numpy/torch;
+# spawned processes inherit these and size their thread pools from them
+share_cores(ANALYSIS_WORKERS)
+
+from app import (UPLOAD_FOLDER, MAX_FILE_SIZE, get_file_type, analyze_path,
+                 admission_controller, admission_error, warm_up_worker)
+from admission import AdmissionRejected, clear_state, estimate_cost
+from probe import ProbeRejected, probe_file
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+app = Quart(__name__, static_folder='static', static_url_path='/static')
+app = cors(app)
+app.config['MAX_CONTENT_LENGTH'] = MAX_FILE_SIZE
+
+# Detection is CPU-bound and partly holds the GIL, so it runs in separate
+# processes. 'spawn' avoids forking after torch/OpenMP have initialised.
+# Each process warms every detector before taking its first job and
+# reports its pid and status once on warm_reports.
+mp_context = multiprocessing.get_context('spawn')
+executor = None
+warm_reports = None
+
+# Warm-up status of each pool process, keyed by pid
+worker_status = {}
+
+def start_executor():
+    """Create a fresh process pool and forget the old one's warm-up reports"""
+    global executor, warm_reports
+    warm_reports = mp_context.Queue()
+    executor = ProcessPoolExecutor(
+        max_workers=ANALYSIS_WORKERS,
+        mp_context=mp_context,
+        initializer=warm_up_worker,
+        initargs=(warm_reports,)
+    )
+    worker_status.clear()
+    return executor
+
+def restart_executor(broken):
+    """Replace a pool broken by a dead process (e.g. OOM-killed) and re-warm it"""
+    if executor is not broken:
+        # Another request already replaced it
+        return
+    logger.error("Analysis process died; restarting the process pool")
+    broken.shutdown(wait=False, cancel_futures=True)
+    start_executor()
+    app.add_background_task(prime_executor)
+
+# Jobs submitted to the executor, running or waiting for a free process
+in_flight = 0
+
+def executor_saturated():
+    return in_flight >= ANALYSIS_WORKERS + ANALYSIS_QUEUE_DEPTH
+
+def busy_response(message='Server is busy, please retry shortly'):
+    response = jsonify({'error': message})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(RETRY_AFTER_SECONDS)
+    return response
+
+async def run_analysis(filepath, file_type, plan):
+    """Run detection in the process pool without blocking the event loop"""
+    global in_flight
+    in_flight += 1
+    pool = executor
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(pool, analyze_path, filepath, file_type, plan)
+    except BrokenProcessPool:
+        # The job isn't retried: the file that killed one process would
+        # likely kill the next
+        restart_executor(pool)
+        raise
+    finally:
+        in_flight -= 1
+
+async def prime_executor():
+    """Spawn every pool process up front and collect each one's warm-up report"""
+    loop = asyncio.get_running_loop()
+    pool, reports = executor, warm_reports
+    # With no idle process, each submit makes the pool spawn another one
+    spawns = [loop.run_in_executor(pool, os.getpid) for _ in range(ANALYSIS_WORKERS)]
+    while len(worker_status) < ANALYSIS_WORKERS and pool is executor:
+        try:
+            pid, status = await loop.run_in_executor(None, reports.get, True, 5)
+        except queue.Empty:
+            # A process that died during warm-up breaks the pool; stop waiting
+            failed = [job for job in spawns if job.done() and job.exception()]
+            if failed:
+                logger.error(f"Process pool failed during warm-up: {failed[0].exception()}")
+                return
+            continue
+        if pool is executor:
+            worker_status[pid] = status
+
+def executor_ready():
+    # A pool with a dead process fails every job until it is replaced
+    if executor is None or executor._broken:
+        return False
+    return len(worker_status) == ANALYSIS_WORKERS and all(
+        step['state'] == 'ready' for status in worker_status.values() for step in status.values()
+    )
+
+@app.route('/')
+async def index():
+    return await render_template('index.html')
+
+@app.route('/api/analyze', methods=['POST'])
+async def analyze_file():
+    # Reject before reading the body so a saturated server sheds load cheaply
+    if executor_saturated():
+        return busy_response()
+
+    filepath = None
+    try:
+        files = await request.files
+        if 'file' not in files:
+            return jsonify({'error': 'No file uploaded'}), 400
+
+        file = files['file']
+        if file.filename == '':
+            return jsonify({'error': 'No file selected'}), 400
+
+        # Save uploaded file under a unique name so concurrent uploads don't clash
+        filename = secure_filename(file.filename)
+        filepath = os.path.join(UPLOAD_FOLDER, f"{uuid.uuid4().hex}_{filename}")
+        await file.save(filepath)
+
+        # Determine file type
+        file_type = get_file_type(filepath)
+
+        if file_type == 'unknown':
+            return jsonify({'error': 'Unsupported file type'}), 400
+
+        # The body read may have taken a while; re-check before queueing
+        if executor_saturated():
+            return busy_response()
+
+        # Read headers to reject bad inputs and plan the analysis
+        loop = asyncio.get_running_loop()
+        try:
+            probe = await loop.run_in_executor(None, probe_file, filepath, file_type)
+        except ProbeRejected as e:
+            return jsonify({'error': str(e)}), e.status_code
+
+        # Wait for this type's concurrency and memory budget without blocking the loop
+        try:
+            async with admission_controller.admit_async(file_type, estimate_cost(probe)):
+                result = await run_analysis(filepath, file_type, probe['plan'])
+        except AdmissionRejected as e:
+            return admission_error(e)
+        except BrokenProcessPool:
+            return busy_response('Analysis worker crashed, please retry shortly')
+
+        # Add metadata
+        result['file_type'] = file_type
+        result['filename'] = filename
+        result['strategy'] = probe['strategy']
+        if file_type == 'audio' and 'features' in result:
+            # The detector only sees the excerpt; report the whole file's length
+            result['features']['duration'] = probe['duration']
+
+        return jsonify(result)
+
+    except Exception as e:
+        logger.error(f"Error in analyze_file: {e}")
+        return jsonify({'error': str(e)}), 500
+    finally:
+        # Clean up uploaded file
+        if filepath and os.path.exists(filepath):
+            os.unlink(filepath)
+
+@app.route('/api/health')
+async def health_check():
+    return jsonify({
+        'status': 'healthy',
+        'message': 'UnAI Detection API is running',
+        'in_flight': in_flight,
+        'capacity': ANALYSIS_WORKERS + ANALYSIS_QUEUE_DEPTH,
+        'ready': executor_ready(),
+        'admission': admission_controller.snapshot()
+    })
+
+@app.route('/api/live')
+async def liveness_check():
+    return jsonify({'status': 'alive'})
+
+@app.route('/api/ready')
+async def readiness_check():
+    # Probed periodically, so a pool that broke while idle gets replaced too
+    if executor is not None and executor._broken:
+        restart_executor(executor)
+    ready = executor_ready()
+    return jsonify({
+        'status': 'ready' if ready else 'not_ready',
+        'workers_warmed': len(worker_status),
+        'workers': worker_status
+    }), 200 if ready else 503
+
+@app.before_serving
+async def start_warm_up():
+    # Reservations left in the state file by a crashed run would otherwise
+    # block uploads; this process is the only one that uses it
+    clear_state(admission_controller.state_file)
+    start_executor()
+    app.add_background_task(prime_executor)
+
+@app.after_serving
+async def shutdown_executor():
+    executor.shutdown(wait=False, cancel_futures=True)
+
+if __name__ == '__main__':
+    app.run(debug=True, host='0.0.0.0', port=5000)
@@ -8,6 +8,7 @@ import cv2
 import tempfile
 import logging
 from werkzeug.utils import secure_filename
+from probe import ProbeRejected, probe_file
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -44,11 +45,15 @@ def get_file_type(filename):
     else:
         return 'unknown'
 
-def detect_ai_image(image_path):
+def detect_ai_image(image_path, max_side=None):
     """Detect if an image is AI-generated using basic analysis"""
     try:
         # Load and preprocess image
-        image = Image.open(image_path).convert('RGB')
+        image = Image.open(image_path)
+        if max_side and max(image.size) > max_side:
+            image.draft('RGB', (max_side, max_side))
+            image.thumbnail((max_side, max_side))
+        image = image.convert('RGB')
         img_array = np.array(image)
         
         # Basic statistical analysis
@@ -183,9 +188,17 @@ def analyze_file():
             os.unlink(filepath)
             return jsonify({'error': 'Unsupported file type'}), 400
         
+        # The extension only names a type; check the headers agree and are sane
+        try:
+            probe = probe_file(filepath, file_type)
+        except ProbeRejected as e:
+            os.unlink(filepath)
+            return jsonify({'error': str(e)}), e.status_code
+        
         # Analyze based on file type
         if file_type == 'image':
-            result = detect_ai_image(filepath)
+            # Simple mode has no tiled analysis; only the resolution cap applies
+            result = detect_ai_image(filepath, max_side=probe['plan'].get('max_side'))
         elif file_type == 'video':
             result = detect_ai_video(filepath)
         elif file_type == 'audio':
@@ -0,0 +1,37 @@
+"""
+UnAI - Gunicorn configuration
+Splits CPU threads between workers and warms every detector in each worker
+before it starts accepting connections.
+"""
+
+import sys
+import time
+
+# Tries at each failed warm-up step before the worker gives up and exits
+WARM_UP_ATTEMPTS = 3
+WARM_UP_RETRY_SECONDS = 2
+
+def on_starting(server):
+    # Admission budgets are shared by all workers; start with none reserved
+    from admission import clear_state
+    clear_state()
+
+    # Workers fork after this, so numpy/torch pick these up when they import
+    from readiness import share_cores
+    share_cores(server.cfg.workers)
+
+def post_worker_init(worker):
+    # Runs before the worker's accept loop, so a cold worker never takes a request
+    from app import readiness
+    for attempt in range(1, WARM_UP_ATTEMPTS + 1):
+        # Steps that already succeeded are skipped on a retry
+        if readiness.warm_up():
+            return
+        worker.log.warning(f"Worker {worker.pid} warm-up attempt {attempt} failed: {readiness.snapshot()}")
+        if attempt < WARM_UP_ATTEMPTS:
+            time.sleep(WARM_UP_RETRY_SECONDS)
+
+    # Exit before accepting connections; the arbiter spawns a replacement.
+    # Not WORKER_BOOT_ERROR (3), which would stop the whole server.
+    worker.log.error(f"Worker {worker.pid} could not warm up, exiting")
+    sys.exit(1)
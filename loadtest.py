@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+UnAI Load Test Script
+Measures how analysis throughput scales with concurrent clients
+"""
+
+import sys
+import time
+import argparse
+import requests
+from concurrent.futures import ThreadPoolExecutor
+
+from test_app import create_test_image
+
+def send_request(url):
+    """Upload one test image and return (status_code, latency_seconds)"""
+    img_bytes = create_test_image()
+    files = {
+        'file': ('test_image.png', img_bytes, 'image/png')
+    }
+    start = time.perf_counter()
+    try:
+        response = requests.post(url, files=files, timeout=120)
+        status = response.status_code
+    except Exception:
+        status = 0
+    return status, time.perf_counter() - start
+
+def run_level(url, concurrency, requests_per_client):
+    """Fire concurrency * requests_per_client uploads and summarise them"""
+    total = concurrency * requests_per_client
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda _: send_request(url), range(total)))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for status, latency in results if status == 200)
+    ok = len(latencies)
+    busy = sum(1 for status, _ in results if status == 503)
+    failed = total - ok - busy
+
+    def percentile(p):
+        if not latencies:
+            return 0.0
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+    return {
+        'concurrency': concurrency,
+        'ok': ok,
+        'busy': busy,
+        'failed': failed,
+        'throughput': ok / elapsed if elapsed > 0 else 0.0,
+        'p50': percentile(0.50),
+        'p95': percentile(0.95)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='UnAI concurrency load test')
+    parser.add_argument('--url', default='http://localhost:5000/api/analyze')
+    parser.add_argument('--levels', default='1,2,4,8,16',
+                        help='Comma-separated client concurrency levels')
+    parser.add_argument('--requests', type=int, default=4,
+                        help='Requests sent by each client per level')
+    args = parser.parse_args()
+
+    print("📈 UnAI Load Test")
+    print("=" * 30)
+    print(f"{'clients':>8} {'ok':>5} {'503':>5} {'fail':>5} {'req/s':>8} {'speedup':>8} {'p50 s':>8} {'p95 s':>8}")
+
+    baseline = None
+    for level in [int(x) for x in args.levels.split(',')]:
+        stats = run_level(args.url, level, args.requests)
+        if baseline is None:
+            baseline = stats['throughput']
+        speedup = stats['throughput'] / baseline if baseline else 0.0
+        print(f"{stats['concurrency']:>8} {stats['ok']:>5} {stats['busy']:>5} {stats['failed']:>5} "
+              f"{stats['throughput']:>8.2f} {speedup:>7.2f}x {stats['p50']:>8.2f} {stats['p95']:>8.2f}")
+
+    if not baseline:
+        print("\n⚠️ No successful requests at the first level")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
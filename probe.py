@@ -0,0 +1,236 @@
+"""
+UnAI - Media header probing
+Reads dimensions, duration, codec and sample rate from file headers without
+decoding any pixels or samples, picks how each file should be analysed and
+rejects pathological inputs (decompression bombs, absurd durations) early.
+"""
+
+import os
+import json
+import logging
+import subprocess
+
+logger = logging.getLogger(__name__)
+
+# Hard limits; anything beyond these is rejected before decoding
+MAX_IMAGE_PIXELS = 40_000_000          # ~40 megapixels
+MAX_VIDEO_PIXELS = 4096 * 4096
+MAX_VIDEO_DURATION = 2 * 60 * 60       # seconds
+MAX_VIDEO_FPS = 240
+MAX_AUDIO_DURATION = 60 * 60           # seconds
+MAX_AUDIO_SAMPLE_RATE = 384_000
+MAX_AUDIO_CHANNELS = 32
+
+# Analysis caps; larger inputs are downscaled or excerpted
+IMAGE_MAX_SIDE = 2048
+IMAGE_TILED_MIN_PIXELS = 1024 * 1024   # larger images use tiled analysis
+IMAGE_TILED_MAX_SIDE = 4096
+VIDEO_FRAME_MAX_SIDE = 720
+VIDEO_MAX_FRAMES = 10
+VIDEO_SAMPLE_WINDOW = 30               # seconds sampled from the start
+AUDIO_ANALYSIS_SAMPLE_RATE = 44_100
+AUDIO_MAX_DURATION = 120               # seconds
+
+FFPROBE_TIMEOUT = 5
+
+class ProbeRejected(Exception):
+    """Raised when a file's headers are unreadable or out of bounds"""
+    def __init__(self, message, status_code=400):
+        super(ProbeRejected, self).__init__(message)
+        self.status_code = status_code
+
+def _ffprobe(filepath):
+    """Return ffprobe's stream and format metadata as a dict"""
+    output = subprocess.run(
+        ['ffprobe', '-v', 'error',
+         '-show_entries',
+         'format=duration:stream=codec_type,codec_name,width,height,'
+         'avg_frame_rate,sample_rate,channels',
+         '-of', 'json', filepath],
+        capture_output=True, timeout=FFPROBE_TIMEOUT, check=True
+    )
+    return json.loads(output.stdout)
+
+def _ffprobe_stream(metadata, codec_type):
+    for stream in metadata.get('streams', []):
+        if stream.get('codec_type') == codec_type:
+            return stream
+    return None
+
+def _parse_rate(rate):
+    """Parse ffprobe rates like '30000/1001'"""
+    try:
+        num, _, den = rate.partition('/')
+        return float(num) / float(den or 1)
+    except (ValueError, ZeroDivisionError, AttributeError):
+        return 0.0
+
+def scaled_size(width, height, max_side):
+    """Size after shrinking so the longest side is at most max_side"""
+    scale = min(1.0, max_side / max(width, height))
+    return max(1, int(width * scale)), max(1, int(height * scale))
+
+def probe_image(filepath):
+    from PIL import Image
+
+    try:
+        # Image.open only parses the header; pixels load on first access
+        with Image.open(filepath) as image:
+            width, height = image.size
+            codec = image.format
+    except Image.DecompressionBombError:
+        raise ProbeRejected('Image dimensions are too large to analyse', 413)
+    except Exception as e:
+        raise ProbeRejected(f'Could not read image headers: {e}')
+
+    if width * height > MAX_IMAGE_PIXELS:
+        raise ProbeRejected(
+            f'Image is {width}x{height}, over the {MAX_IMAGE_PIXELS // 1_000_000} megapixel limit', 413
+        )
+
+    if width * height > IMAGE_TILED_MIN_PIXELS:
+        # Tiled cost is linear in area, so large images keep more resolution
+        strategy = 'tiled'
+        plan = {'tiled': True}
+        if max(width, height) > IMAGE_TILED_MAX_SIDE:
+            plan['max_side'] = IMAGE_TILED_MAX_SIDE
+    elif max(width, height) > IMAGE_MAX_SIDE:
+        strategy = 'downscale'
+        plan = {'max_side': IMAGE_MAX_SIDE}
+    else:
+        strategy = 'full'
+        plan = {}
+
+    return {
+        'width': width,
+        'height': height,
+        'codec': codec,
+        'strategy': strategy,
+        'plan': plan
+    }
+
+def probe_video(filepath):
+    width = height = 0
+    duration = fps = 0.0
+    codec = None
+
+    try:
+        metadata = _ffprobe(filepath)
+        stream = _ffprobe_stream(metadata, 'video')
+        if stream:
+            width = int(stream.get('width', 0))
+            height = int(stream.get('height', 0))
+            fps = _parse_rate(stream.get('avg_frame_rate'))
+            codec = stream.get('codec_name')
+        duration = float(metadata.get('format', {}).get('duration', 0))
+    except Exception as e:
+        # ffprobe missing or confused; OpenCV reads the same container fields
+        logger.warning(f"ffprobe failed on {filepath}, using OpenCV: {e}")
+        import cv2
+        capture = cv2.VideoCapture(filepath)
+        try:
+            width = int(capture.get(cv2.CAP_PROP_FRAME_WIDTH))
+            height = int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            fps = capture.get(cv2.CAP_PROP_FPS)
+            frame_count = capture.get(cv2.CAP_PROP_FRAME_COUNT)
+            duration = frame_count / fps if fps > 0 else 0.0
+        finally:
+            capture.release()
+
+    if width <= 0 or height <= 0:
+        raise ProbeRejected('No readable video stream found')
+    if width * height > MAX_VIDEO_PIXELS:
+        raise ProbeRejected(f'Video resolution {width}x{height} is too large to analyse', 413)
+    if duration <= 0:
+        raise ProbeRejected('Could not determine video duration')
+    if duration > MAX_VIDEO_DURATION:
+        raise ProbeRejected(f'Video is longer than {MAX_VIDEO_DURATION // 60} minutes', 413)
+    if fps > MAX_VIDEO_FPS:
+        raise ProbeRejected(f'Video frame rate {fps:.0f} fps is not supported')
+
+    plan = {
+        'max_frames': min(VIDEO_MAX_FRAMES, max(1, int(duration))),
+        'sample_window': min(duration, VIDEO_SAMPLE_WINDOW)
+    }
+    if max(width, height) > VIDEO_FRAME_MAX_SIDE:
+        # moviepy asks ffmpeg to scale while decoding, so frames arrive small
+        _, frame_height = scaled_size(width, height, VIDEO_FRAME_MAX_SIDE)
+        plan['frame_height'] = frame_height
+
+    return {
+        'width': width,
+        'height': height,
+        'duration': duration,
+        'fps': fps,
+        'codec': codec,
+        'strategy': 'sampled',
+        'plan': plan
+    }
+
+def probe_audio(filepath):
+    try:
+        import soundfile as sf
+        info = sf.info(filepath)
+        sample_rate = info.samplerate
+        channels = info.channels
+        duration = info.duration
+        codec = info.subtype
+    except Exception as e:
+        # Older libsndfile can't parse mp3/m4a; ffprobe can
+        logger.info(f"soundfile could not read {filepath}, using ffprobe: {e}")
+        try:
+            metadata = _ffprobe(filepath)
+        except Exception as e:
+            raise ProbeRejected(f'Could not read audio headers: {e}')
+        stream = _ffprobe_stream(metadata, 'audio')
+        if stream is None:
+            raise ProbeRejected('No readable audio stream found')
+        sample_rate = int(stream.get('sample_rate', 0))
+        channels = int(stream.get('channels', 0))
+        duration = float(metadata.get('format', {}).get('duration', 0))
+        codec = stream.get('codec_name')
+
+    if sample_rate <= 0 or sample_rate > MAX_AUDIO_SAMPLE_RATE:
+        raise ProbeRejected(f'Unsupported audio sample rate: {sample_rate} Hz')
+    if channels <= 0 or channels > MAX_AUDIO_CHANNELS:
+        raise ProbeRejected(f'Unsupported number of audio channels: {channels}')
+    if duration <= 0:
+        raise ProbeRejected('Could not determine audio duration')
+    if duration > MAX_AUDIO_DURATION:
+        raise ProbeRejected(f'Audio is longer than {MAX_AUDIO_DURATION // 60} minutes', 413)
+
+    plan = {}
+    if sample_rate > AUDIO_ANALYSIS_SAMPLE_RATE:
+        plan['sample_rate'] = AUDIO_ANALYSIS_SAMPLE_RATE
+    if duration > AUDIO_MAX_DURATION:
+        plan['max_duration'] = AUDIO_MAX_DURATION
+
+    return {
+        'sample_rate': sample_rate,
+        'channels': channels,
+        'duration': duration,
+        'codec': codec,
+        'strategy': 'excerpt' if 'max_duration' in plan else 'full',
+        'plan': plan
+    }
+
+PROBES = {
+    'image': probe_image,
+    'video': probe_video,
+    'audio': probe_audio
+}
+
+def probe_file(filepath, file_type):
+    """Read a file's media headers and choose how to analyse it
+
+    Returns a dict of header fields plus 'strategy' and 'plan', the keyword
+    arguments for the matching detector. Raises ProbeRejected for inputs
+    that are unreadable or too large to analyse.
+    """
+    if file_type not in PROBES:
+        raise ProbeRejected('Unsupported file type')
+
+    probe = PROBES[file_type](filepath)
+    probe['file_type'] = file_type
+    probe['size_bytes'] = os.path.getsize(filepath)
+    return probe
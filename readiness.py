@@ -0,0 +1,79 @@
+"""
+UnAI - Worker readiness
+Runs registered warm-up steps (imports, thread pools, JIT compilation, a
+dummy input through each detector) at worker boot and records per-step
+status, so health checks only route traffic to workers that are hot.
+"""
+
+import os
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+PENDING = 'pending'
+WARMING = 'warming'
+READY = 'ready'
+FAILED = 'failed'
+
+# Thread pool sizes read by numpy/torch (BLAS, OpenMP), tiling and app.py
+THREAD_ENV_VARS = ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS',
+                   'TILE_WORKERS', 'WORKER_THREADS')
+
+def share_cores(processes):
+    """Give each of processes worker processes an equal share of the cores
+
+    Sets thread-count environment defaults; call before the workers import
+    numpy or torch so their thread pools are sized from it.
+    """
+    threads = str(max(1, (os.cpu_count() or 1) // processes))
+    for var in THREAD_ENV_VARS:
+        os.environ.setdefault(var, threads)
+
+class Readiness:
+    """Registry of named warm-up steps and their status"""
+    def __init__(self):
+        self._steps = {}
+        self._status = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def register(self, name, warm):
+        """Add a warm-up step; warm() raises to signal failure"""
+        self._steps[name] = warm
+        self._status[name] = {'state': PENDING}
+
+    def warm_up(self):
+        """Run every step that hasn't succeeded yet, in registration order"""
+        with self._lock:
+            for name, warm in self._steps.items():
+                if self._status[name]['state'] == READY:
+                    continue
+                self._status[name] = {'state': WARMING}
+                start = time.perf_counter()
+                try:
+                    warm()
+                    self._status[name] = {
+                        'state': READY,
+                        'seconds': round(time.perf_counter() - start, 3)
+                    }
+                    logger.info(f"Warmed {name} in {self._status[name]['seconds']}s")
+                except Exception as e:
+                    self._status[name] = {'state': FAILED, 'error': str(e)}
+                    logger.error(f"Warm-up step {name} failed: {e}")
+        return self.is_ready()
+
+    def start(self):
+        """Warm up on a background thread, once"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.warm_up, name='warm-up', daemon=True)
+            self._thread.start()
+
+    def is_ready(self):
+        return bool(self._status) and all(
+            status['state'] == READY for status in self._status.values()
+        )
+
+    def snapshot(self):
+        return {name: dict(status) for name, status in self._status.items()}
@@ -58,7 +58,11 @@ def main():
     
     try:
         # Import and run the app
-        from app import app
+        from app import app, readiness
+        # With debug on, the reloader re-runs this script in a child process
+        # that serves requests; only that one needs warming up
+        if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+            readiness.start()
         app.run(debug=True, host='0.0.0.0', port=5000)
     except KeyboardInterrupt:
         print("\n👋 Server stopped by user")
@@ -70,6 +70,6 @@ echo "2. Run the app: python app.py"
 echo "3. Open http://localhost:5000 in your browser"
 echo ""
 echo "For production deployment, consider using gunicorn:"
-echo "gunicorn -w 4 -b 0.0.0.0:5000 app:app"
+echo "gunicorn --config gunicorn.conf.py -w 4 -b 0.0.0.0:5000 app:app"
 echo ""
 echo "Happy AI detecting! 🤖🔍"
\ No newline at end of file
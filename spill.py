@@ -0,0 +1,53 @@
+"""
+UnAI - Memory-mapped scratch space
+Large intermediates (decoded PCM, STFTs and spectrograms) are backed by
+anonymous temporary files through np.memmap, so the kernel can write them
+back and evict them under pressure instead of the worker being OOM-killed.
+"""
+
+import os
+import tempfile
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Arrays smaller than this stay in ordinary memory
+SPILL_THRESHOLD_BYTES = int(os.environ.get('SPILL_THRESHOLD_BYTES', 64 * 1024 * 1024))
+# Disk by default; point at a tmpfs such as /dev/shm for RAM-backed scratch
+SPILL_DIR = os.environ.get('SPILL_DIR') or tempfile.gettempdir()
+
+class ScratchSpace:
+    """Allocates large arrays in memory-mapped scratch files
+
+    Use as a context manager; every file is closed when the block exits.
+    Files are created unnamed (or unlinked) so nothing is left behind if
+    the worker dies. Arrays must not be used after the block exits.
+    """
+    def __init__(self, directory=SPILL_DIR, threshold=SPILL_THRESHOLD_BYTES):
+        self.directory = directory
+        self.threshold = threshold
+        self._files = []
+
+    def empty(self, shape, dtype):
+        """Uninitialised array, memory-mapped when at least threshold bytes"""
+        dtype = np.dtype(dtype)
+        nbytes = int(np.prod(shape)) * dtype.itemsize
+        if nbytes < self.threshold:
+            return np.empty(shape, dtype=dtype)
+
+        scratch_file = tempfile.TemporaryFile(dir=self.directory, prefix='unai-')
+        self._files.append(scratch_file)
+        logger.info(f"Spilling {nbytes // (1024 * 1024)} MB {dtype} array to {self.directory}")
+        return np.memmap(scratch_file, dtype=dtype, mode='w+', shape=shape)
+
+    def close(self):
+        for scratch_file in self._files:
+            scratch_file.close()
+        self._files = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,180 @@
+"""
+UnAI Admission Control Tests
+Unit tests for the shared per-type budgets; no server needed
+"""
+
+import os
+import time
+import asyncio
+import threading
+import multiprocessing
+import pytest
+
+from admission import (MB, AdmissionController, AdmissionRejected, _start_time, clear_state,
+                       estimate_cost)
+
+LIMITS = {
+    'image': {'concurrency': 2, 'memory_mb': 100, 'queue': 1},
+    'video': {'concurrency': 1, 'memory_mb': 100, 'queue': 0}
+}
+
+@pytest.fixture
+def controller(tmp_path):
+    return AdmissionController(LIMITS, state_file=str(tmp_path / 'state.json'),
+                               queue_timeout=0.5, poll_interval=0.01)
+
+def test_admit_reserves_and_releases(controller):
+    with controller.admit('image', 10 * MB):
+        usage = controller.snapshot()['image']
+        assert usage['active'] == 1
+        assert usage['reserved_mb'] == 10
+    assert controller.snapshot()['image'] == {'active': 0, 'waiting': 0, 'reserved_mb': 0}
+
+def test_cost_over_budget_is_rejected_with_413(controller):
+    with pytest.raises(AdmissionRejected) as error:
+        with controller.admit('image', 101 * MB):
+            pass
+    assert error.value.status_code == 413
+    assert controller.snapshot()['image']['active'] == 0
+
+def test_concurrency_limit_rejects_without_queue(controller):
+    with controller.admit('video', 1 * MB):
+        with pytest.raises(AdmissionRejected) as error:
+            with controller.admit('video', 1 * MB):
+                pass
+    assert error.value.status_code == 503
+    assert error.value.retry_after == controller.retry_after
+
+def test_memory_budget_rejects_when_timeout_is_zero(controller):
+    with controller.admit('image', 60 * MB):
+        with pytest.raises(AdmissionRejected):
+            with controller.admit('image', 60 * MB, timeout=0):
+                pass
+
+def test_waiter_is_admitted_when_slot_frees(controller):
+    admitted = threading.Event()
+
+    def waiter():
+        with controller.admit('image', 60 * MB):
+            admitted.set()
+
+    with controller.admit('image', 60 * MB):
+        thread = threading.Thread(target=waiter)
+        thread.start()
+        time.sleep(0.1)
+        assert not admitted.is_set()
+        assert controller.snapshot()['image']['waiting'] == 1
+    thread.join(timeout=2)
+    assert admitted.is_set()
+    assert controller.snapshot()['image']['waiting'] == 0
+
+def test_waiter_times_out(controller):
+    with controller.admit('image', 60 * MB):
+        start = time.monotonic()
+        with pytest.raises(AdmissionRejected) as error:
+            with controller.admit('image', 60 * MB, timeout=0.2):
+                pass
+        assert time.monotonic() - start >= 0.2
+    assert 'Timed out' in str(error.value)
+    assert controller.snapshot()['image']['waiting'] == 0
+
+def test_full_queue_rejects_immediately(controller):
+    release = threading.Event()
+
+    def holder():
+        with controller.admit('image', 60 * MB):
+            release.wait(2)
+
+    def waiter():
+        try:
+            with controller.admit('image', 60 * MB, timeout=2):
+                pass
+        except AdmissionRejected:
+            pass
+
+    threads = [threading.Thread(target=holder), threading.Thread(target=waiter)]
+    threads[0].start()
+    time.sleep(0.05)
+    threads[1].start()
+    time.sleep(0.1)
+    try:
+        with pytest.raises(AdmissionRejected) as error:
+            with controller.admit('image', 60 * MB, timeout=2):
+                pass
+        assert 'Too many' in str(error.value)
+    finally:
+        release.set()
+        for thread in threads:
+            thread.join(timeout=3)
+
+def _hold_slot(state_file, ready, release):
+    other = AdmissionController(LIMITS, state_file=state_file)
+    with other.admit('video', 1 * MB):
+        ready.set()
+        release.wait(5)
+
+def test_budget_is_shared_across_processes(controller):
+    context = multiprocessing.get_context('spawn')
+    ready, release = context.Event(), context.Event()
+    process = context.Process(target=_hold_slot, args=(controller.state_file, ready, release))
+    process.start()
+    try:
+        assert ready.wait(10)
+        with pytest.raises(AdmissionRejected):
+            with controller.admit('video', 1 * MB):
+                pass
+    finally:
+        release.set()
+        process.join(10)
+    with controller.admit('video', 1 * MB):
+        pass
+
+def test_reservations_of_dead_processes_are_dropped(controller):
+    with controller._state() as state:
+        state['reserved']['gone'] = {'pid': 2 ** 22 + 1, 'type': 'video', 'cost': MB}
+    with controller.admit('video', 1 * MB):
+        assert controller.snapshot()['video']['active'] == 1
+
+def test_reservations_of_reused_pids_are_dropped(controller):
+    started = _start_time(os.getpid())
+    if started is None:
+        pytest.skip('process start times need /proc')
+    with controller._state() as state:
+        state['reserved']['old'] = {'pid': os.getpid(), 'started': started - 1,
+                                    'type': 'video', 'cost': MB}
+    with controller.admit('video', 1 * MB):
+        assert controller.snapshot()['video']['active'] == 1
+
+def test_clear_state_forgets_reservations(controller):
+    with controller._state() as state:
+        state['reserved']['held'] = {'pid': os.getpid(), 'type': 'video', 'cost': MB}
+    clear_state(controller.state_file)
+    assert controller.snapshot()['video']['active'] == 0
+
+def test_estimate_cost_follows_plan():
+    probe = {'file_type': 'image', 'width': 8000, 'height': 4000, 'size_bytes': 1,
+             'plan': {'tiled': True, 'max_side': 4000}}
+    assert estimate_cost(probe) == 4000 * 2000 * 32
+    fallback = {'file_type': 'video', 'size_bytes': 1000, 'plan': {}}
+    assert estimate_cost(fallback) == 10000
+
+def test_audio_cost_counts_native_rate_decode():
+    probe = {'file_type': 'audio', 'sample_rate': 384_000, 'channels': 32, 'duration': 600,
+             'size_bytes': 1, 'plan': {'sample_rate': 44_100, 'max_duration': 120}}
+    decode = 120 * 384_000 * 33 * 4
+    assert estimate_cost(probe) == decode + 120 * 44_100 * 48
+
+def test_admit_async_waits_for_a_slot(controller):
+    async def scenario():
+        order = []
+
+        async def job(name, hold):
+            async with controller.admit_async('video', 1 * MB):
+                order.append(name)
+                await asyncio.sleep(hold)
+
+        await asyncio.gather(job('first', 0.1), job('second', 0))
+        return order
+
+    controller.limits = dict(LIMITS, video={'concurrency': 1, 'memory_mb': 100, 'queue': 1})
+    assert asyncio.run(scenario()) == ['first', 'second']
@@ -40,6 +40,27 @@ def test_health_endpoint():
         print(f"❌ Health check error: {e}")
         return False
 
+def test_ready_endpoint():
+    """Test the liveness and readiness endpoints"""
+    try:
+        live = requests.get('http://localhost:5000/api/live', timeout=5)
+        if live.status_code != 200:
+            print(f"❌ Liveness check failed with status: {live.status_code}")
+            return False
+        
+        response = requests.get('http://localhost:5000/api/ready', timeout=5)
+        data = response.json()
+        if response.status_code == 200:
+            print("✅ Readiness check passed: all detectors warm")
+            return True
+        else:
+            print(f"❌ Readiness check failed with status: {response.status_code}")
+            print(f"   Detectors: {data.get('detectors', data.get('workers'))}")
+            return False
+    except Exception as e:
+        print(f"❌ Readiness check error: {e}")
+        return False
+
 def test_analyze_endpoint():
     """Test the analyze endpoint with a sample image"""
     try:
@@ -98,6 +119,7 @@ def main():
     
     tests = [
         ("Health Check", test_health_endpoint),
+        ("Readiness", test_ready_endpoint),
         ("Web Interface", test_web_interface),
         ("Analysis Endpoint", test_analyze_endpoint),
     ]
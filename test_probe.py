@@ -0,0 +1,163 @@
+"""
+UnAI Header Probing Tests
+Unit tests for input limits and analysis plans; no server needed
+"""
+
+import pytest
+
+np = pytest.importorskip('numpy')
+Image = pytest.importorskip('PIL.Image')
+sf = pytest.importorskip('soundfile')
+
+import probe
+from probe import ProbeRejected, probe_file
+
+def write_png(tmp_path, width, height, name='image.png'):
+    path = tmp_path / name
+    Image.new('L', (width, height)).save(path)
+    return str(path)
+
+def write_wav(tmp_path, sample_rate=8000, channels=1, seconds=1.0, name='audio.wav'):
+    path = tmp_path / name
+    sf.write(path, np.zeros((int(sample_rate * seconds), channels), dtype=np.float32), sample_rate)
+    return str(path)
+
+def fake_ffprobe(monkeypatch, width=1920, height=1080, rate='30/1', duration=100.0):
+    metadata = {
+        'streams': [{'codec_type': 'video', 'codec_name': 'h264', 'width': width,
+                     'height': height, 'avg_frame_rate': rate}],
+        'format': {'duration': str(duration)}
+    }
+    monkeypatch.setattr(probe, '_ffprobe', lambda filepath: metadata)
+
+def test_scaled_size_keeps_aspect_and_never_grows():
+    assert probe.scaled_size(5000, 300, 4096) == (4096, 245)
+    assert probe.scaled_size(100, 80, 2048) == (100, 80)
+
+def test_small_image_is_analysed_in_full(tmp_path):
+    result = probe_file(write_png(tmp_path, 100, 80), 'image')
+    assert result['strategy'] == 'full'
+    assert result['plan'] == {}
+    assert (result['width'], result['height'], result['codec']) == (100, 80, 'PNG')
+    assert result['file_type'] == 'image'
+    assert result['size_bytes'] > 0
+
+def test_one_megapixel_is_not_tiled(tmp_path):
+    result = probe_file(write_png(tmp_path, 1024, 1024), 'image')
+    assert result['strategy'] == 'full'
+
+def test_long_thin_image_is_downscaled(tmp_path):
+    result = probe_file(write_png(tmp_path, 3000, 10), 'image')
+    assert result['strategy'] == 'downscale'
+    assert result['plan'] == {'max_side': probe.IMAGE_MAX_SIDE}
+
+def test_large_image_is_tiled(tmp_path):
+    result = probe_file(write_png(tmp_path, 1200, 1000), 'image')
+    assert result['strategy'] == 'tiled'
+    assert result['plan'] == {'tiled': True}
+
+def test_very_wide_tiled_image_is_capped(tmp_path):
+    result = probe_file(write_png(tmp_path, 5000, 300), 'image')
+    assert result['strategy'] == 'tiled'
+    assert result['plan'] == {'tiled': True, 'max_side': probe.IMAGE_TILED_MAX_SIDE}
+
+def test_image_over_pixel_limit_is_rejected(tmp_path, monkeypatch):
+    monkeypatch.setattr(probe, 'MAX_IMAGE_PIXELS', 5000)
+    with pytest.raises(ProbeRejected) as error:
+        probe_file(write_png(tmp_path, 100, 80), 'image')
+    assert error.value.status_code == 413
+
+def test_decompression_bomb_is_rejected(tmp_path, monkeypatch):
+    path = write_png(tmp_path, 100, 80)
+    monkeypatch.setattr(Image, 'MAX_IMAGE_PIXELS', 1000)
+    with pytest.raises(ProbeRejected) as error:
+        probe_file(path, 'image')
+    assert error.value.status_code == 413
+
+def test_unreadable_image_is_rejected(tmp_path):
+    path = tmp_path / 'image.png'
+    path.write_bytes(b'not an image')
+    with pytest.raises(ProbeRejected) as error:
+        probe_file(str(path), 'image')
+    assert error.value.status_code == 400
+
+def test_short_audio_is_analysed_in_full(tmp_path):
+    result = probe_file(write_wav(tmp_path), 'audio')
+    assert result['strategy'] == 'full'
+    assert result['plan'] == {}
+    assert (result['sample_rate'], result['channels']) == (8000, 1)
+    assert result['duration'] == pytest.approx(1.0)
+
+def test_high_rate_audio_is_resampled(tmp_path):
+    result = probe_file(write_wav(tmp_path, sample_rate=48000, channels=2, seconds=0.1), 'audio')
+    assert result['plan'] == {'sample_rate': probe.AUDIO_ANALYSIS_SAMPLE_RATE}
+    assert result['channels'] == 2
+
+def test_long_audio_is_excerpted(tmp_path, monkeypatch):
+    monkeypatch.setattr(probe, 'AUDIO_MAX_DURATION', 0.5)
+    result = probe_file(write_wav(tmp_path), 'audio')
+    assert result['strategy'] == 'excerpt'
+    assert result['plan'] == {'max_duration': 0.5}
+
+def test_overlong_audio_is_rejected(tmp_path, monkeypatch):
+    monkeypatch.setattr(probe, 'MAX_AUDIO_DURATION', 0.5)
+    with pytest.raises(ProbeRejected) as error:
+        probe_file(write_wav(tmp_path), 'audio')
+    assert error.value.status_code == 413
+
+def test_unsupported_sample_rate_is_rejected(tmp_path, monkeypatch):
+    monkeypatch.setattr(probe, 'MAX_AUDIO_SAMPLE_RATE', 8000)
+    with pytest.raises(ProbeRejected) as error:
+        probe_file(write_wav(tmp_path, sample_rate=16000, seconds=0.1), 'audio')
+    assert error.value.status_code == 400
+    assert 'sample rate' in str(error.value)
+
+def test_too_many_channels_are_rejected(tmp_path, monkeypatch):
+    monkeypatch.setattr(probe, 'MAX_AUDIO_CHANNELS', 1)
+    with pytest.raises(ProbeRejected) as error:
+        probe_file(write_wav(tmp_path, channels=2, seconds=0.1), 'audio')
+    assert 'channels' in str(error.value)
+
+def test_unreadable_audio_is_rejected(tmp_path, monkeypatch):
+    path = tmp_path / 'audio.mp3'
+    path.write_bytes(b'not audio')
+    monkeypatch.setattr(probe, '_ffprobe', lambda filepath: {'streams': []})
+    with pytest.raises(ProbeRejected) as error:
+        probe_file(str(path), 'audio')
+    assert error.value.status_code == 400
+
+def test_video_is_sampled_at_reduced_resolution(tmp_path, monkeypatch):
+    fake_ffprobe(monkeypatch)
+    path = tmp_path / 'video.mp4'
+    path.write_bytes(b'')
+    result = probe_file(str(path), 'video')
+    assert result['strategy'] == 'sampled'
+    assert result['fps'] == 30
+    assert result['plan'] == {'max_frames': probe.VIDEO_MAX_FRAMES,
+                              'sample_window': probe.VIDEO_SAMPLE_WINDOW,
+                              'frame_height': 405}
+
+def test_short_video_samples_one_frame_per_second(tmp_path, monkeypatch):
+    fake_ffprobe(monkeypatch, width=640, height=360, duration=3.5)
+    path = tmp_path / 'video.mp4'
+    path.write_bytes(b'')
+    assert probe_file(str(path), 'video')['plan'] == {'max_frames': 3, 'sample_window': 3.5}
+
+@pytest.mark.parametrize('fields, status_code', [
+    ({'width': 8192, 'height': 4320}, 413),
+    ({'duration': 3 * 60 * 60}, 413),
+    ({'duration': 0}, 400),
+    ({'rate': '1000/1'}, 400),
+    ({'width': 0}, 400)
+])
+def test_out_of_bounds_video_is_rejected(tmp_path, monkeypatch, fields, status_code):
+    fake_ffprobe(monkeypatch, **fields)
+    path = tmp_path / 'video.mp4'
+    path.write_bytes(b'')
+    with pytest.raises(ProbeRejected) as error:
+        probe_file(str(path), 'video')
+    assert error.value.status_code == status_code
+
+def test_unknown_type_is_rejected(tmp_path):
+    with pytest.raises(ProbeRejected):
+        probe_file(write_png(tmp_path, 10, 10), 'document')
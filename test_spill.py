@@ -0,0 +1,119 @@
+"""
+UnAI Scratch Space and Audio Loading Tests
+Unit tests for memory-mapped scratch arrays and block-read audio decoding
+"""
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from spill import ScratchSpace
+
+def test_small_arrays_stay_in_memory(tmp_path):
+    with ScratchSpace(directory=str(tmp_path), threshold=1024) as scratch:
+        array = scratch.empty((255,), np.float32)
+        assert type(array) is np.ndarray
+        assert scratch._files == []
+
+def test_arrays_at_threshold_are_memory_mapped(tmp_path):
+    with ScratchSpace(directory=str(tmp_path), threshold=1024) as scratch:
+        array = scratch.empty((256,), np.float32)
+        assert isinstance(array, np.memmap)
+        array[:] = 1.5
+        assert float(array.sum()) == 384.0
+        spilled = scratch.empty((16, 16), np.complex64)
+        assert isinstance(spilled, np.memmap)
+        assert spilled.shape == (16, 16)
+        files = list(scratch._files)
+    assert len(files) == 2
+
+def test_scratch_files_are_closed_and_leave_nothing_behind(tmp_path):
+    with ScratchSpace(directory=str(tmp_path), threshold=0) as scratch:
+        scratch.empty((1024,), np.float32)
+        files = list(scratch._files)
+    assert all(scratch_file.closed for scratch_file in files)
+    assert scratch._files == []
+    assert list(tmp_path.iterdir()) == []
+
+def test_scratch_files_are_closed_on_error(tmp_path):
+    with pytest.raises(ValueError):
+        with ScratchSpace(directory=str(tmp_path), threshold=0) as scratch:
+            scratch.empty((1024,), np.float32)
+            files = list(scratch._files)
+            raise ValueError('analysis failed')
+    assert all(scratch_file.closed for scratch_file in files)
+
+@pytest.fixture
+def app_module():
+    pytest.importorskip('librosa')
+    pytest.importorskip('soundfile')
+    return pytest.importorskip('app')
+
+def write_tone(path, sample_rate, channels, seconds):
+    import soundfile as sf
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    signal = np.stack([np.sin(2 * np.pi * 220 * (c + 1) * t) / (c + 1)
+                       for c in range(channels)], axis=1)
+    sf.write(path, signal.astype(np.float32), sample_rate, subtype='FLOAT')
+    return str(path)
+
+@pytest.mark.parametrize('spill', [False, True])
+def test_load_audio_matches_librosa_mono(app_module, tmp_path, monkeypatch, spill):
+    import librosa
+    # Blocks smaller than the file, so the block loop is exercised
+    monkeypatch.setattr(app_module, 'AUDIO_BLOCK_FRAMES', 1000)
+    path = write_tone(tmp_path / 'tone.wav', 8000, 3, 1.3)
+    expected, expected_sr = librosa.load(path, sr=None)
+
+    threshold = 0 if spill else 1 << 30
+    with ScratchSpace(directory=str(tmp_path), threshold=threshold) as scratch:
+        y, sr = app_module.load_audio(path, scratch)
+        assert isinstance(y, np.memmap) == spill
+        assert sr == expected_sr
+        np.testing.assert_allclose(y, expected, atol=1e-6)
+
+def test_load_audio_cuts_to_max_duration(app_module, tmp_path):
+    path = write_tone(tmp_path / 'tone.wav', 8000, 2, 2.0)
+    with ScratchSpace(directory=str(tmp_path)) as scratch:
+        y, sr = app_module.load_audio(path, scratch, max_duration=0.5)
+        assert len(y) == 4000
+
+def test_load_audio_resamples_through_librosa(app_module, tmp_path):
+    path = write_tone(tmp_path / 'tone.wav', 16000, 2, 1.0)
+    with ScratchSpace(directory=str(tmp_path)) as scratch:
+        y, sr = app_module.load_audio(path, scratch, sample_rate=8000)
+        assert sr == 8000
+        assert len(y) == 8000
+
+def reference_audio_features(path):
+    """The per-feature librosa calls detect_ai_audio made before its STFT was shared"""
+    import librosa
+    y, sr = librosa.load(path, sr=None)
+    tempo, _ = librosa.beat.beat_track(y=y, sr=sr)
+    mfccs = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=13)
+    return {
+        'spectral_variance': float(np.var(librosa.feature.spectral_centroid(y=y, sr=sr))),
+        'mfcc_variance': float(np.mean([np.var(mfcc) for mfcc in mfccs])),
+        'tempo': float(tempo)
+    }
+
+@pytest.mark.parametrize('threshold', [0, 1 << 30])
+def test_shared_stft_features_match_separate_librosa_calls(app_module, tmp_path, monkeypatch,
+                                                           threshold):
+    import functools
+    # Clicks every half second over a decaying tone, so beat tracking has a tempo
+    sample_rate = 22050
+    t = np.arange(sample_rate * 6) / sample_rate
+    signal = 0.3 * np.sin(2 * np.pi * 330 * t) * np.exp(-(t % 0.5) * 8)
+    signal[(np.arange(len(t)) % (sample_rate // 2)) < 200] += 0.8
+    path = str(tmp_path / 'clicks.wav')
+    import soundfile as sf
+    sf.write(path, signal.astype(np.float32), sample_rate, subtype='FLOAT')
+
+    monkeypatch.setattr(app_module, 'ScratchSpace',
+                        functools.partial(ScratchSpace, directory=str(tmp_path), threshold=threshold))
+    features = app_module.detect_ai_audio(path)['features']
+    expected = reference_audio_features(path)
+    assert features['spectral_variance'] == pytest.approx(expected['spectral_variance'], rel=1e-3)
+    assert features['mfcc_variance'] == pytest.approx(expected['mfcc_variance'], rel=1e-3)
+    assert features['tempo'] == pytest.approx(expected['tempo'])
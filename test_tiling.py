@@ -0,0 +1,71 @@
+"""
+UnAI Tiled Analysis Tests
+Unit tests for tile layout and aggregation; no server needed
+"""
+
+import pytest
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('cv2')
+
+import tiling
+
+def test_tile_origins_cover_length_flush_to_end():
+    assert tiling.tile_origins(1000, 256, 192) == [0, 192, 384, 576, 744]
+    assert tiling.tile_origins(640, 256, 192) == [0, 192, 384]
+
+def test_tile_origins_short_length_is_single_tile():
+    assert tiling.tile_origins(256, 256, 192) == [0]
+    assert tiling.tile_origins(10, 256, 192) == [0]
+
+def test_split_tiles_are_views_of_full_size():
+    gray = np.zeros((600, 1000), dtype=np.uint8)
+    tiles = tiling.split_tiles(gray, tile_size=256, overlap=64)
+    assert len(tiles) == 3 * 5
+    assert all(tile.shape == (256, 256) for tile in tiles)
+    assert all(tile.base is gray for tile in tiles)
+
+def test_split_tiles_small_image_is_one_tile():
+    gray = np.zeros((100, 50), dtype=np.uint8)
+    tiles = tiling.split_tiles(gray)
+    assert len(tiles) == 1
+    assert tiles[0].shape == (100, 50)
+
+def test_lbp_variance_flat_and_degenerate():
+    assert tiling.lbp_variance(np.full((20, 20), 7, dtype=np.uint8)) == 0.0
+    assert tiling.lbp_variance(np.zeros((2, 50), dtype=np.uint8)) == 0.0
+
+def test_lbp_variance_matches_per_pixel_loop():
+    rng = np.random.default_rng(1)
+    tile = rng.integers(0, 256, (12, 9), dtype=np.uint8)
+    codes = []
+    for i in range(1, tile.shape[0] - 1):
+        for j in range(1, tile.shape[1] - 1):
+            code = 0
+            for bit, (di, dj) in enumerate(tiling.LBP_OFFSETS):
+                if tile[i + di, j + dj] >= tile[i, j]:
+                    code |= 1 << (7 - bit)
+            codes.append(code)
+    assert tiling.lbp_variance(tile) == pytest.approx(np.var(codes))
+
+def test_analyze_tiles_reports_levels_and_features():
+    rng = np.random.default_rng(0)
+    gray = rng.integers(0, 256, (600, 1000), dtype=np.uint8)
+    stats = tiling.analyze_tiles(gray)
+    assert stats['tiles_per_level'] == [15, 6]
+    assert 0 < stats['edge_density'] <= 1
+    assert stats['frequency_variance'] > 0
+    assert stats['texture_variance'] > 0
+
+def test_analyze_tiles_uniform_image_has_no_spread():
+    stats = tiling.analyze_tiles(np.full((512, 512), 128, dtype=np.uint8))
+    assert stats['tile_variance_spread'] == 0
+    assert stats['edge_density'] == 0
+
+def test_analyze_tiles_thin_image_stops_pyramid():
+    stats = tiling.analyze_tiles(np.zeros((4, 600), dtype=np.uint8))
+    assert len(stats['tiles_per_level']) == 1
+
+def test_analyze_tiles_rejects_degenerate_shape():
+    with pytest.raises(ValueError):
+        tiling.analyze_tiles(np.zeros((2, 5000), dtype=np.uint8))